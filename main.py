@@ -1,29 +1,136 @@
 #!/usr/bin/env python3
 import os
+import re
+import json
 import sys
+import time
+import queue
+import atexit
+import random
 import logging
+import logging.handlers
 import argparse
-from pathlib import Path
+import threading
+from types import MappingProxyType
+from urllib.parse import parse_qs, urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from tqdm import tqdm
-from tqdm.contrib.logging import logging_redirect_tqdm
 from ytmusicapi import YTMusic, OAuthCredentials
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
+
+# Global playlist state and constants
+PLAYLIST_FILE = None  # Buffered handle kept open for the whole run
+PLAYLIST_ENTRIES = set()  # Entries already in the playlist file
+PLAYLIST_BUFFER_SIZE = 128 * 1024
+playlist_lock = threading.Lock()  # Guards playlist writes from download threads
+PROGRESS_UPDATE_INTERVAL = 0.1  # Minimum seconds between per-song bar updates
+WATCH_URL = "https://music.youtube.com/watch?v="
+VIDEO_ID_RE = re.compile(r"\[([A-Za-z0-9_-]{11})\]")  # "[<video_id>]" in filenames
+# YouTube messages for videos that will not come back on a later run
+PERMANENT_ERROR_RE = re.compile(
+    r"video unavailable|has been removed|private video", re.IGNORECASE
+)
+
+# Static part of the yt-dlp options, built once and shared by every download.
+YDL_POSTPROCESSORS = (
+    {
+        "key": "FFmpegExtractAudio",
+        "preferredcodec": "mp3",
+        "preferredquality": "320",
+    },
+    {"key": "EmbedThumbnail"},
+    {"key": "FFmpegMetadata"},
+)
+YDL_BASE_OPTS = MappingProxyType(
+    {
+        "format": "mp3/bestaudio/best",
+        "quiet": True,
+        "noplaylist": True,
+        "postprocessors": YDL_POSTPROCESSORS,
+        "ignoreerrors": True,
+    }
+)
+
+
+class TqdmLoggingHandler(logging.Handler):
+    """Logging handler that writes through tqdm so progress bars stay intact."""
+
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record), file=sys.stderr)
+        except Exception:
+            self.handleError(record)
+
 
-# Global progress bars, playlist filepath, and list for failed URLs
-global_progress_bar = None
-individual_progress_bar = None
-PLAYLIST_FILEPATH = None
-failed_urls = []  # List to store failed download URLs
+class YoutubeDLErrorLogger:
+    """yt-dlp logger that records the error messages of the current download.
+
+    Extraction and download errors never reach the progress hooks, yt-dlp only
+    reports them through its logger, so each worker reads `errors` after every
+    URL to find out whether it failed.
+    """
+
+    def __init__(self):
+        self.errors = []
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        logging.warning(msg)
+
+    def error(self, msg):
+        self.errors.append(msg)
 
 
 def setup_logging():
-    """Configure logging to display timestamps and log levels."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+    """Configure logging to display timestamps and log levels.
+
+    Log calls format the message and put the record on a queue; a listener
+    thread writes it, so download threads never block on terminal output.
+    """
+    handler = TqdmLoggingHandler()
+    handler.setFormatter(
+        logging.Formatter(
+            fmt="%(asctime)s [%(levelname)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
     )
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    # Stopping the listener flushes the records still waiting in the queue.
+    atexit.register(listener.stop)
+
+
+def get_positive_int_env(name, default):
+    """Read an optional positive integer from an environment variable.
+
+    An unset or empty variable falls back to `default`. Any other value that is
+    not a positive integer is logged and raises ValueError.
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        logging.error(
+            f"Invalid environment variable {name}={value!r}: "
+            "expected a positive integer."
+        )
+        raise ValueError(f"{name} must be a positive integer.")
+    return number
 
 
 def load_configuration():
@@ -36,18 +143,25 @@ def load_configuration():
         "music_folderpath": os.getenv("MUSIC_FOLDERPATH"),
         "playlist_filepath": os.getenv("PLAYLIST_FILEPATH"),
         "playlist_id": os.getenv("PLAYLIST_ID"),
+        "download_workers": get_positive_int_env("DOWNLOAD_WORKERS", 4),
+        "concurrent_fragments": get_positive_int_env("YT_CONCURRENT_FRAGMENTS", 4),
+        "failures_filepath": os.getenv("FAILURES_FILEPATH"),  # Optional
     }
-    # Only enforce required values except cookies_filepath.
+    # Only enforce required values except the optional file paths.
     missing = [
         key
         for key, value in config.items()
-        if key != "cookies_filepath" and value is None
+        if key not in ("cookies_filepath", "failures_filepath") and value is None
     ]
     if missing:
         logging.error(f"Missing environment variables: {', '.join(missing)}")
         raise ValueError(
             "Configuration incomplete. Please set the missing environment variables."
         )
+    if not config["failures_filepath"]:
+        config["failures_filepath"] = os.path.join(
+            config["music_folderpath"], "permanent_failures.json"
+        )
     return config
 
 
@@ -62,44 +176,119 @@ def initialize_api(config):
     )
 
 
-def get_playlist(api, playlist_id, limit=5000):
-    """Retrieve songs from the specified playlist using its playlist ID."""
+def get_playlist(api, playlist_id, limit=5000, first_fetch_limit=100):
+    """Stream songs from the specified playlist using its playlist ID.
+
+    A quick first fetch with a small limit is yielded right away so downloads
+    can start immediately. ytmusicapi only counts continuation pages against
+    the limit, so this returns the first two pages (about 200 songs). The full
+    playlist is then retrieved in a background thread and yielded as a whole;
+    songs returned by both fetches are dropped by the video ID dedup in
+    `build_download_queue`, even if the playlist changed in between.
+    """
     logging.info(f"Retrieving playlist '{playlist_id}' from YouTube Music...")
-    data = api.get_playlist(playlist_id, limit=limit)
-    tracks = data.get("tracks", [])
+    data = api.get_playlist(playlist_id, limit=min(first_fetch_limit, limit))
+    first_tracks = data.get("tracks", [])
+    track_count = min(data.get("trackCount") or limit, limit)
+    if len(first_tracks) >= track_count:
+        logging.info(f"Retrieved {len(first_tracks)} songs from playlist.")
+        yield from first_tracks
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        full_playlist = executor.submit(api.get_playlist, playlist_id, limit=limit)
+        yield from first_tracks
+        tracks = full_playlist.result().get("tracks", [])
     logging.info(f"Retrieved {len(tracks)} songs from playlist.")
-    return tracks
+    yield from tracks
 
 
 def get_already_downloaded(music_folderpath):
-    """Scan the music folder and return a list of already downloaded MP3 filenames."""
+    """Scan the music folder and return the video IDs of already downloaded MP3s.
+
+    yt-dlp names files "<title> [<video_id>].mp3", so the IDs are extracted
+    from the bracketed part of each filename.
+    """
     logging.info("Scanning for already downloaded songs...")
-    downloaded = [
-        file.name for file in Path(music_folderpath).glob("*.mp3") if file.is_file()
-    ]
-    logging.info(f"Found {len(downloaded)} downloaded song(s).")
-    return downloaded
+    downloaded_ids = set()
+    count = 0
+    # DirEntry caches the file type from the directory listing, so no extra
+    # stat call is made per entry (except for symlinks, which are followed).
+    with os.scandir(music_folderpath) as entries:
+        for entry in entries:
+            if entry.name.endswith(".mp3") and entry.is_file():
+                count += 1
+                downloaded_ids.update(VIDEO_ID_RE.findall(entry.name))
+    logging.info(f"Found {count} downloaded song(s).")
+    return frozenset(downloaded_ids)
+
+
+def load_permanent_failures(failures_filepath):
+    """Load the video IDs of songs that failed permanently on previous runs."""
+    try:
+        with open(failures_filepath, encoding="utf-8") as failures_file:
+            video_ids = frozenset(json.load(failures_file))
+    except FileNotFoundError:
+        return frozenset()
+    except json.JSONDecodeError:
+        logging.warning(
+            f"Ignoring invalid permanent failures file '{failures_filepath}'."
+        )
+        return frozenset()
+    logging.info(f"Skipping {len(video_ids)} permanently unavailable song(s).")
+    return video_ids
+
 
+def save_permanent_failures(failures_filepath, video_ids):
+    """Save the video IDs of songs that failed permanently for the next runs."""
+    with open(failures_filepath, "w", encoding="utf-8") as failures_file:
+        json.dump(sorted(video_ids), failures_file, indent=2)
+    logging.info(f"Saved {len(video_ids)} permanently unavailable song(s).")
 
-def build_download_queue(tracks, already_downloaded):
-    """Build a list of song URLs to download, filtering out songs already downloaded."""
+
+def is_permanent_error(error_msg):
+    """Return whether a yt-dlp error means the video is gone for good."""
+    # HTTP status errors (e.g. 503 Service Unavailable) are transient.
+    return "HTTP Error" not in error_msg and bool(PERMANENT_ERROR_RE.search(error_msg))
+
+
+def build_download_queue(tracks, already_downloaded_ids, permanent_failures):
+    """Yield song URLs to download.
+
+    Songs already downloaded, songs that failed permanently on a previous
+    run, and repeated occurrences of the same song are filtered out.
+    """
     logging.info("Building the download queue...")
-    queue = []
+    # Per-track messages are DEBUG only and not even formatted otherwise.
+    log_tracks = logging.getLogger().isEnabledFor(logging.DEBUG)
+    log_debug = logging.debug
+    queued = 0
+    seen_ids = set()
     for track in tracks:
-        title = track.get("title", "Unknown Title")
         video_id = track.get("videoId")
         if not video_id:
+            title = track.get("title", "Unknown Title")
             logging.warning(f"Skipping track '{title}' (missing video ID).")
             continue
+        if video_id in seen_ids:
+            if log_tracks:
+                log_debug(f"Duplicate: {track.get('title', 'Unknown Title')}")
+            continue
+        seen_ids.add(video_id)
         # Check if the song is already downloaded (using video ID in filename)
-        if not any(f"[{video_id}]" in filename for filename in already_downloaded):
-            url = f"https://music.youtube.com/watch?v={video_id}"
-            queue.append(url)
-            logging.info(f"Queued: {title}")
-        else:
-            logging.info(f"Already downloaded: {title}")
-    logging.info(f"Total new songs to download: {len(queue)}")
-    return queue
+        if video_id in already_downloaded_ids:
+            if log_tracks:
+                log_debug(f"Already downloaded: {track.get('title', 'Unknown Title')}")
+            continue
+        if video_id in permanent_failures:
+            if log_tracks:
+                log_debug(f"Unavailable: {track.get('title', 'Unknown Title')}")
+            continue
+        queued += 1
+        if log_tracks:
+            log_debug(f"Queued: {track.get('title', 'Unknown Title')}")
+        yield WATCH_URL + video_id
+    logging.info(f"Total new songs to download: {queued}")
 
 
 def create_youtube_dl_options(config, use_cookies=False):
@@ -108,96 +297,197 @@ def create_youtube_dl_options(config, use_cookies=False):
     If `use_cookies` is True and a cookies_filepath is provided in config,
     the cookiefile option will be added.
     """
-    opts = {
-        "format": "mp3/bestaudio/best",
-        "paths": {"home": config["music_folderpath"]},
-        "quiet": True,
-        "noplaylist": True,
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "320",
-            },
-            {"key": "EmbedThumbnail"},
-            {"key": "FFmpegMetadata"},
-        ],
-        "progress_hooks": [progress_hook],
-        "ignoreerrors": True,
-    }
+    opts = dict(
+        YDL_BASE_OPTS,
+        paths={"home": config["music_folderpath"]},
+        # Download HLS/DASH fragments of a single song over several connections.
+        concurrent_fragment_downloads=config["concurrent_fragments"],
+    )
     if use_cookies and config.get("cookies_filepath"):
         opts["cookiefile"] = config["cookies_filepath"]
     return opts
 
 
 def update_playlist(filename, title):
-    """Append the downloaded song's path to the M3U playlist file."""
-    global PLAYLIST_FILEPATH
-    entry = f"/srv/music/{filename}\n"
-    with open(PLAYLIST_FILEPATH, "a", encoding="utf-8") as playlist:
-        playlist.write(entry)
+    """Append the downloaded song's path to the M3U playlist file.
+
+    Songs already listed in the playlist are not appended again.
+    """
+    entry = f"/srv/music/{filename}"
+    with playlist_lock:
+        if entry in PLAYLIST_ENTRIES:
+            return
+        PLAYLIST_ENTRIES.add(entry)
+        PLAYLIST_FILE.write(f"{entry}\n")
     tqdm.write(f"Added '{title}' to playlist.")
 
 
-def progress_hook(d):
-    """Hook to update tqdm progress bars during downloads.
+def make_progress_hook(position=1):
+    """Create a yt-dlp progress hook that updates tqdm progress bars.
 
-    Handles "downloading", "finished", and "error" statuses.
-    In the error case, logs the error and stores the failed URL for retry.
+    Each YoutubeDL instance gets its own hook, so the per-song progress bar
+    lives in the closure instead of in shared global state.
+    The hook handles "downloading" and "finished" statuses; yt-dlp reports
+    errors through its logger instead (see `YoutubeDLErrorLogger`).
+    """
+    individual_progress_bar = None
+    last_update_ts = 0.0
+
+    def progress_hook(d):
+        nonlocal individual_progress_bar, last_update_ts
+        status = d.get("status")
+
+        if status == "downloading":
+            if individual_progress_bar is None:
+                total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+                title = d.get("info_dict", {}).get("title", "Downloading")
+                individual_progress_bar = tqdm(
+                    total=total_bytes,
+                    unit="B",
+                    unit_scale=True,
+                    desc=f"Downloading: {title}",
+                    position=position,
+                    leave=False,
+                )
+                last_update_ts = time.monotonic()
+            else:
+                # yt-dlp calls this hook very often, only redraw the bar periodically.
+                downloaded_bytes = d.get("downloaded_bytes", 0)
+                now = time.monotonic()
+                if (
+                    now - last_update_ts >= PROGRESS_UPDATE_INTERVAL
+                    or downloaded_bytes == individual_progress_bar.total
+                ):
+                    individual_progress_bar.update(
+                        downloaded_bytes - individual_progress_bar.n
+                    )
+                    last_update_ts = now
+
+        elif status == "finished":
+            if individual_progress_bar:
+                individual_progress_bar.close()
+                individual_progress_bar = None
+            filepath = d.get("filename", "")
+            filename = os.path.splitext(os.path.basename(filepath))[0] + ".mp3"
+            title = d.get("info_dict", {}).get("title", "Unknown Title")
+            update_playlist(filename, title)
+            tqdm.write(f"Finished downloading: {title}")
+
+    return progress_hook
+
+
+def download_songs(songs_to_download, youtube_dl_opts, max_workers=4):
+    """Download songs concurrently using yt-dlp and update progress bars.
+
+    `songs_to_download` may be any iterable, including a generator that is
+    still producing URLs; each URL is submitted as soon as it is available.
+    Each worker thread owns its own YoutubeDL instance, progress hook and
+    error logger so that cookie jars and other per-instance state are never
+    shared.
+    Returns the number of songs submitted and a dict mapping each failed URL
+    to its last error message.
     """
-    global individual_progress_bar, global_progress_bar, failed_urls
-    status = d.get("status")
-
-    if status == "downloading":
-        if individual_progress_bar is None:
-            total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-            title = d.get("info_dict", {}).get("title", "Downloading")
-            individual_progress_bar = tqdm(
-                total=total_bytes,
-                unit="B",
-                unit_scale=True,
-                desc=f"Downloading: {title}",
-                position=1,
-                leave=False,
-            )
-        else:
-            downloaded_bytes = d.get("downloaded_bytes", 0)
-            individual_progress_bar.update(downloaded_bytes - individual_progress_bar.n)
-
-    elif status == "finished":
-        if individual_progress_bar:
-            individual_progress_bar.close()
-            individual_progress_bar = None
-        global_progress_bar.update(1)
-        filepath = d.get("filename", "")
-        filename = f"{Path(filepath).stem}.mp3"
-        title = d.get("info_dict", {}).get("title", "Unknown Title")
-        update_playlist(filename, title)
-        tqdm.write(f"Finished downloading: {title}")
-
-    elif status == "error":
-        # Close individual progress bar if it's open
-        if individual_progress_bar:
-            individual_progress_bar.close()
-            individual_progress_bar = None
-        error_msg = d.get("error", "Unknown error")
-        failed_url = d.get("info_dict", {}).get("webpage_url")
-        logging.error(f"Error downloading {failed_url}: {error_msg}")
-        if failed_url and failed_url not in failed_urls:
-            failed_urls.append(failed_url)
-        global_progress_bar.update(1)
-
-
-def download_songs(songs_to_download, youtube_dl_opts):
-    """Download songs using yt-dlp and update progress bars."""
-    global global_progress_bar
-    total_songs = len(songs_to_download)
     global_progress_bar = tqdm(
-        total=total_songs, unit="song", desc="Overall Progress", position=0
+        total=0, unit="song", desc="Overall Progress", position=0
     )
-    with YoutubeDL(youtube_dl_opts) as ydl:
-        ydl.download(songs_to_download)
-    global_progress_bar.close()
+    failed_urls = {}  # Failed download URL -> error message, in insertion order
+    lock = threading.Lock()
+    worker_state = threading.local()
+    downloaders = []
+
+    def init_worker():
+        error_logger = YoutubeDLErrorLogger()
+        with lock:
+            # Position 0 is the overall bar, workers get one line each below it.
+            hook = make_progress_hook(len(downloaders) + 1)
+            ydl = YoutubeDL(
+                dict(youtube_dl_opts, progress_hooks=[hook], logger=error_logger)
+            )
+            downloaders.append(ydl)
+        worker_state.ydl = ydl
+        worker_state.error_logger = error_logger
+
+    def download(url):
+        errors = worker_state.error_logger.errors
+        errors.clear()
+        try:
+            worker_state.ydl.download([url])
+        except DownloadError as err:
+            errors.append(str(err))
+        with lock:
+            global_progress_bar.update(1)
+            if not errors:
+                return
+            error_msg = errors[-1]
+            failed_urls[url] = error_msg
+        logging.error(f"Error downloading {url}: {error_msg}")
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, initializer=init_worker)
+    futures = []
+    try:
+        for url in songs_to_download:
+            futures.append(executor.submit(download, url))
+            with lock:
+                global_progress_bar.total += 1
+                global_progress_bar.refresh()
+        for future in futures:
+            future.result()
+    except BaseException:
+        # Drop the queued downloads so that Ctrl-C stops the run right away.
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        for ydl in downloaders:
+            ydl.close()
+        PLAYLIST_FILE.flush()
+        global_progress_bar.close()
+    return len(futures), failed_urls
+
+
+def get_video_id(url):
+    """Return the video ID from a YouTube watch URL, or None if it has none."""
+    return parse_qs(urlsplit(url).query).get("v", [None])[0]
+
+
+def retry_with_backoff(
+    failed_urls,
+    youtube_dl_opts,
+    max_workers=4,
+    max_attempts=4,
+    base=2.0,
+    jitter=0.1,
+):
+    """Retry failed downloads with exponential backoff between attempts.
+
+    Waits `base * 2**(attempt - 1)` seconds (randomized by +/- `jitter`)
+    between attempts so that rate limits have time to expire, and only retries
+    the URLs that failed in the previous round. Songs that failed with a
+    permanent error (see `is_permanent_error`) during a retry are not retried
+    again. `failed_urls` maps each URL to its error message; the URLs that
+    still failed are returned the same way.
+    """
+    unavailable = {}
+    remaining = dict(failed_urls)
+    for attempt in range(max_attempts):
+        if attempt > 0:
+            # Errors passed in by the caller may come from an attempt without
+            # cookies, so only permanent errors seen here stop the retries.
+            for url, error_msg in list(remaining.items()):
+                if is_permanent_error(error_msg):
+                    unavailable[url] = remaining.pop(url)
+            if not remaining:
+                break
+            delay = base * 2 ** (attempt - 1) * (1 + random.uniform(-jitter, jitter))
+            logging.info(f"Waiting {delay:.1f}s before retrying...")
+            time.sleep(delay)
+        logging.info(
+            f"Retry attempt {attempt + 1}/{max_attempts} for {len(remaining)} song(s)..."
+        )
+        _, remaining = download_songs(list(remaining), youtube_dl_opts, max_workers)
+        if not remaining:
+            break
+    return {**unavailable, **remaining}
 
 
 def main():
@@ -224,44 +514,67 @@ def main():
         logging.error("Exiting due to configuration error.")
         sys.exit(1)
 
-    global PLAYLIST_FILEPATH
-    PLAYLIST_FILEPATH = config["playlist_filepath"]
-
-    with logging_redirect_tqdm():
+    global PLAYLIST_FILE, PLAYLIST_ENTRIES
+    with open(
+        config["playlist_filepath"],
+        "a+",
+        buffering=PLAYLIST_BUFFER_SIZE,
+        encoding="utf-8",
+    ) as PLAYLIST_FILE:
+        # Read the existing entries once, writes still go to the end of the file.
+        PLAYLIST_FILE.seek(0)
+        PLAYLIST_ENTRIES = {line.rstrip("\n") for line in PLAYLIST_FILE}
         yt_api = initialize_api(config)
+        downloaded_ids = get_already_downloaded(config["music_folderpath"])
+        known_failures = load_permanent_failures(config["failures_filepath"])
         tracks = get_playlist(yt_api, config["playlist_id"], limit=5000)
-        downloaded_files = get_already_downloaded(config["music_folderpath"])
-        songs_to_download = build_download_queue(tracks, downloaded_files)
+        songs_to_download = build_download_queue(tracks, downloaded_ids, known_failures)
 
-        if not songs_to_download:
-            logging.info("No new songs to download. Exiting.")
-            sys.exit(0)
-
-        # First attempt: download without cookies enabled
+        # First attempt: download without cookies enabled. The playlist is
+        # still being fetched while the first songs download.
         ytdl_opts = create_youtube_dl_options(config, use_cookies=False)
         logging.info("Starting downloads (first attempt)...")
-        download_songs(songs_to_download, ytdl_opts)
+        downloaded, failed_urls = download_songs(
+            songs_to_download,
+            ytdl_opts,
+            config["download_workers"],
+        )
+        if not downloaded:
+            logging.info("No new songs to download. Exiting.")
+            sys.exit(0)
         logging.info("First download attempt completed.")
 
         # If there were errors and a cookies file is provided, retry failed downloads.
         if failed_urls and config.get("cookies_filepath"):
-            retry_list = failed_urls.copy()
-            # Clear the failed_urls list for the retry attempt.
-            failed_urls.clear()
             logging.info(
-                f"Retrying {len(retry_list)} failed downloads with cookies enabled..."
+                f"Retrying {len(failed_urls)} failed downloads with cookies enabled..."
             )
             ytdl_opts_retry = create_youtube_dl_options(config, use_cookies=True)
-            download_songs(retry_list, ytdl_opts_retry)
+            failed_urls = retry_with_backoff(
+                failed_urls, ytdl_opts_retry, config["download_workers"]
+            )
             if failed_urls:
                 logging.error(
-                    f"After retry, {len(failed_urls)} downloads still failed: {failed_urls}"
+                    f"After retry, {len(failed_urls)} downloads still failed: {list(failed_urls)}"
                 )
             else:
                 logging.info("All failed downloads succeeded on retry.")
         elif failed_urls:
             logging.error(
-                f"Downloads failed for {len(failed_urls)} songs: {failed_urls}"
+                f"Downloads failed for {len(failed_urls)} songs: {list(failed_urls)}"
+            )
+
+        # Only the final errors count: with a cookies file, a song is remembered
+        # as unavailable only after it also failed with cookies.
+        new_failures = {
+            get_video_id(url)
+            for url, error_msg in failed_urls.items()
+            if is_permanent_error(error_msg)
+        }
+        new_failures.discard(None)
+        if new_failures - known_failures:
+            save_permanent_failures(
+                config["failures_filepath"], known_failures | new_failures
             )
 
         logging.info("All downloads completed.")